@@ -1,8 +1,81 @@
+from dataclasses import asdict
+
+import numpy as np
 import pandas as pd
 from data_stream import DataGateway
 from data_loader import DataLoader
-from models import Trade, MarketData
-from strategies import RSI, BB, Zscore
+from models import Trade, TickView
+from strategies import make_strategy_triplet
+
+# numba is optional: the numeric kernels below run fine as plain Python,
+# they are just JIT-compiled when numba is installed.
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def _decide_action(pos: int, num_buy: int, num_sell: int) -> int:
+    """
+    Pure-numeric entry/exit decision (same rules as the NVDA backtest):
+      1 = open long, 2 = close long, 3 = open short, 4 = close short, 0 = nothing.
+    Kept free of Python objects so numba can compile it in nopython mode.
+    """
+    if pos == 0 and num_buy >= 2 and num_sell == 0:
+        return 1
+    if pos > 0 and num_sell >= 2:
+        return 2
+    if pos == 0 and num_sell >= 2 and num_buy == 0:
+        return 3
+    if pos < 0 and num_buy >= 2:
+        return 4
+    return 0
+
+
+def _position_qty(port_val: float, frac: float, price: float, cash: float, is_buy: bool) -> int:
+    """
+    Typed sizing kernel: fixed fraction of portfolio value, capped by cash
+    for longs. Pure arithmetic so it compiles to native code under numba.
+    """
+    notional_target = port_val * frac
+    if is_buy and cash < notional_target:
+        # can't spend more cash than we have; capping the notional before
+        # dividing keeps this to a single division + int truncation
+        # (floor(min(a, b) / p) == min(floor(a / p), floor(b / p)))
+        notional_target = cash
+    if notional_target <= 0:
+        return 0
+    qty = int(notional_target / price)
+    return qty if qty > 0 else 0
+
+
+if njit is not None:
+    _decide_action = njit(cache=True)(_decide_action)
+    _position_qty = njit(cache=True)(_position_qty)
+
+
+def _build_tally(k: int):
+    """
+    Generate a vote-tally function specialized for exactly k strategies per
+    symbol. The generated code unrolls the strategy loop, so the interpreter
+    skips the iterator setup and loop bookkeeping on every tick.
+    """
+    lines = ["def _tally(strats, tick):", "    num_buy = 0", "    num_sell = 0"]
+    for i in range(k):
+        lines += [
+            f"    sigs = strats[{i}].generate_signals(tick)",
+            "    if sigs:",
+            "        d = sigs[-1][0]",
+            "        if d == 1:",
+            "            num_buy += 1",
+            "        elif d == -1:",
+            "            num_sell += 1",
+        ]
+    lines.append("    return num_buy, num_sell")
+    namespace: dict = {}
+    exec(compile("\n".join(lines), f"<tally k={k}>", "exec"), namespace)
+    return namespace["_tally"]
+
 
 class BacktestEngine:
     """
@@ -18,63 +91,125 @@ class BacktestEngine:
         strategies_by_symbol: dict[str, list["Strategy"]],
         initial_capital: float = 100_000.0,
         notional_frac_per_trade: float = 0.01,  # ~2% of capital per new trade
+        symbol_table: tuple[str, ...] | None = None,
     ):
         self.strategies_by_symbol = strategies_by_symbol
 
+        # Symbols are interned to small integer ids so all per-symbol state
+        # lives in flat lists indexed by sid instead of string-keyed dicts.
+        # Pass the DataGateway's symbol_table so the gateway-assigned sids on
+        # each TickView can be used directly; otherwise ids are derived from
+        # the strategy map and looked up per tick.
+        if symbol_table is not None:
+            self.symbol_table = tuple(symbol_table)
+            self._trust_tick_sid = True
+        else:
+            self.symbol_table = tuple(strategies_by_symbol)
+            self._trust_tick_sid = False
+        self._sid = {sym: i for i, sym in enumerate(self.symbol_table)}
+        n = len(self.symbol_table)
+
         self.initial_capital = initial_capital
         self.cash = initial_capital
 
-        # position per symbol: >0 = long shares, <0 = short shares
-        self.positions: dict[str, int] = {}
-        self.entry_price: dict[str, float] = {}     # avg entry price per symbol
+        # running mark-to-market of open positions (sum of qty * last_price),
+        # updated incrementally so portfolio_value() never rescans positions
+        self._mtm = 0.0
+
+        # position per symbol id: >0 = long shares, <0 = short shares
+        self.positions: list[int] = [0] * n
+        # ids of symbols with a non-zero position, so end-of-run scans don't
+        # have to walk the whole (mostly flat) universe
+        self._open_sids: set[int] = set()
+        self.entry_price: list[float] = [0.0] * n   # avg entry price per symbol
+        self.last_price: list[float] = [0.0] * n    # last seen price per symbol
+        self.last_timestamp: list[object] = [None] * n  # last seen timestamp per symbol
+
+        # strategies indexed by symbol id (None when we have no strategies)
+        self._strats_by_id = [strategies_by_symbol.get(sym) for sym in self.symbol_table]
 
-        self.last_price: dict[str, float] = {}      # last seen price per symbol
-        self.last_timestamp: dict[str, object] = {} # last seen timestamp per symbol
+        # if every symbol runs the same number of strategies (the usual
+        # RSI/BB/Zscore triplet), build an unrolled tally specialized for
+        # that count at runtime
+        counts = {len(strats) for strats in self._strats_by_id if strats}
+        self._tally = _build_tally(counts.pop()) if len(counts) == 1 else None
 
         # fraction of capital we commit per *new* position
         self.notional_frac_per_trade = notional_frac_per_trade
 
-        # trade log
+        # trade log (trades are rare relative to ticks, so a plain list is fine)
         self.trades: list[Trade] = []
 
-        # cash list for later analysis
-        self.history = []
-
-    # ---------- internal helpers ----------
-
-    def _direction_from_signals(self, signals: list[tuple]) -> int:
+        # per-tick cash history: preallocated arrays written by
+        # record_history instead of a list growing by append per tick
+        self._hist_ts: np.ndarray | None = None
+        self._hist_cash: np.ndarray | None = None
+        self._hist_len = 0
+
+    # ---------- per-tick history ----------
+
+    def reserve(self, n_ticks: int) -> None:
+        """Preallocate the cash-history buffers when the tick count is known."""
+        # timestamps arrive as int64 nanoseconds from the DataGateway
+        self._hist_ts = np.empty(n_ticks, dtype=np.int64)
+        self._hist_cash = np.empty(n_ticks, dtype=np.float64)
+        self._hist_len = 0
+
+    def record_history(self, ts: int) -> None:
+        """Record current cash against ts. Call once per tick, after on_tick."""
+        i = self._hist_len
+        if self._hist_ts is None:
+            self.reserve(1024)
+        elif i >= len(self._hist_ts):
+            # caller under-reserved: double the buffers
+            self._hist_ts = np.concatenate([self._hist_ts, np.empty(len(self._hist_ts), dtype=np.int64)])
+            self._hist_cash = np.concatenate([self._hist_cash, np.empty(len(self._hist_cash), dtype=np.float64)])
+        self._hist_ts[i] = ts
+        self._hist_cash[i] = self.cash
+        self._hist_len = i + 1
+
+    @property
+    def history(self) -> list[tuple]:
+        """Cash history as (timestamp, cash) tuples, for compatibility."""
+        if self._hist_ts is None:
+            return []
+        return list(zip(self._hist_ts[: self._hist_len], self._hist_cash[: self._hist_len]))
+
+    def history_frame(self, tz=None) -> pd.DataFrame:
         """
-        Reduce a list of (action, symbol, price, ts) to +1 / -1 / 0 for THIS tick.
-        If multiple signals appear in one tick, use the last one.
+        Cash history as a timestamp-indexed DataFrame.
+        Int64 nanosecond ticks are turned back into real timestamps here,
+        once, instead of per tick on the hot path.
         """
-        if not signals:
-            return 0
-        last_action = signals[-1][0]  # your strategies: +1 (BUY), -1 (SELL)
-        return int(last_action)
+        if self._hist_ts is None:
+            index = pd.Index([], name="timestamp")
+            return pd.DataFrame({"cash": []}, index=index)
+        ts = self._hist_ts[: self._hist_len]
+        if np.issubdtype(ts.dtype, np.integer):
+            index = pd.to_datetime(ts, utc=True)
+            if tz is not None:
+                index = index.tz_convert(tz)
+        else:
+            index = pd.Index(ts)
+        index.name = "timestamp"
+        return pd.DataFrame({"cash": self._hist_cash[: self._hist_len]}, index=index)
+
+    # ---------- internal helpers ----------
 
     def _position_size(self, price: float, side: str) -> int:
         """
         Simple size: use a fixed fraction of initial capital per trade.
         For longs, also respect available cash.
         """
-        notional_target = self.portfolio_value() * self.notional_frac_per_trade
-        if notional_target <= 0:
-            return 0
-
-        qty = int(notional_target // price)
-        if qty <= 0:
-            return 0
-
-        if side == "BUY":
-            # can't spend more cash than we have
-            max_affordable = int(self.cash // price)
-            qty = min(qty, max_affordable)
-            if qty <= 0:
-                return 0
-
-        return qty
-
-    def _open_position(self, symbol: str, side: str, price: float, ts: object) -> None:
+        return _position_qty(
+            self.portfolio_value(),
+            self.notional_frac_per_trade,
+            price,
+            self.cash,
+            side == "BUY",
+        )
+
+    def _open_position(self, sid: int, side: str, price: float, ts: object) -> None:
         qty = self._position_size(price, side)
         if qty == 0:
             return
@@ -82,93 +217,107 @@ class BacktestEngine:
         if side == "BUY":
             # open/extend long
             self.cash -= qty * price
-            self.positions[symbol] = self.positions.get(symbol, 0) + qty
+            self.positions[sid] += qty
+            self._mtm += qty * price
         else:  # "SELL" to open short
             self.cash += qty * price
-            self.positions[symbol] = self.positions.get(symbol, 0) - qty
+            self.positions[sid] -= qty
+            self._mtm -= qty * price
 
-        self.entry_price[symbol] = price
-        self.trades.append(Trade(symbol, ts, side, qty, price))
+        self._open_sids.add(sid)
+        self.entry_price[sid] = price
+        self.trades.append(Trade(self.symbol_table[sid], ts, side, qty, price))
 
-    def _close_position(self, symbol: str, price: float, ts: object) -> None:
+    def _close_position(self, sid: int, price: float, ts: object) -> None:
         """
         Close whatever position we currently have in this symbol.
         Realized PnL is recorded in the closing Trade.
         """
-        qty = self.positions.get(symbol, 0)
+        qty = self.positions[sid]
         if qty == 0:
             return
 
+        entry = self.entry_price[sid]
         if qty > 0:  # closing long -> sell
             side = "SELL"
             self.cash += qty * price
-            entry = self.entry_price.get(symbol, price)
             pnl = (price - entry) * qty
         else:        # closing short -> buy back
             side = "BUY"
             qty_to_buy = -qty
             self.cash -= qty_to_buy * price
-            entry = self.entry_price.get(symbol, price)
             pnl = (entry - price) * qty_to_buy
 
-        self.positions[symbol] = 0
-        self.trades.append(Trade(symbol, ts, side, abs(qty), price, pnl))
+        self.positions[sid] = 0
+        self._open_sids.discard(sid)
+        self._mtm -= qty * price  # position is gone from the mark-to-market
+        self.trades.append(Trade(self.symbol_table[sid], ts, side, abs(qty), price, pnl))
 
     # ---------- main tick handler ----------
 
-    def on_tick(self, tick: MarketData) -> None:
+    def on_tick(self, tick: TickView) -> None:
         """
-        Call this for *every* MarketData tick from your generator.
+        Call this for *every* TickView tick from your generator.
+        Fields are read positionally (timestamp, symbol, close_price, ...)
+        to avoid attribute lookups on the hot path.
         """
-        symbol = tick.symbol
-        price = float(tick.close_price)
-
-        # update last seen price/time
-        self.last_price[symbol] = price
-        self.last_timestamp[symbol] = tick.timestamp
-
-        strat_list = self.strategies_by_symbol.get(symbol)
+        ts = tick[0]
+
+        sid = tick[7] if self._trust_tick_sid else None
+        if sid is None:
+            sid = self._sid.get(tick[1])
+            if sid is None:
+                return  # unknown symbol
+        price = float(tick[2])
+
+        # update last seen price/time (and the cached mark-to-market if we
+        # hold this symbol)
+        qty_held = self.positions[sid]
+        if qty_held != 0:
+            self._mtm += qty_held * (price - self.last_price[sid])
+        self.last_price[sid] = price
+        self.last_timestamp[sid] = ts
+
+        strat_list = self._strats_by_id[sid]
         if not strat_list:
             return  # no strategies for this symbol
 
-        # 1) Ask each strategy for its signals on this tick
-        directions: list[int] = []
-        for strat in strat_list:
-            sigs = strat.generate_signals(tick)  # list[(action, sym, price, ts)]
-            dir_ = self._direction_from_signals(sigs)  # -1, 0, +1
-            directions.append(dir_)
-
-        # count buys and sells (Exactly like my NVDA-only code)
-        num_buy  = sum(1 for d in directions if d == 1)
-        num_sell = sum(1 for d in directions if d == -1)
+        # 1) Ask each strategy for its signals and tally the votes in the
+        # same pass (one scan instead of building a directions list and
+        # re-scanning it twice); use the unrolled specialized tally when
+        # the strategy count is uniform
+        if self._tally is not None:
+            num_buy, num_sell = self._tally(strat_list, tick)
+        else:
+            num_buy = 0
+            num_sell = 0
+            for strat in strat_list:
+                sigs = strat.generate_signals(tick)  # list[(action, sym, price, ts)]
+                if sigs:
+                    d = int(sigs[-1][0])  # last signal wins for this tick
+                    if d == 1:
+                        num_buy += 1
+                    elif d == -1:
+                        num_sell += 1
 
         # if nobody fired, do nothing
         if num_buy == 0 and num_sell == 0:
             return
 
-        pos = self.positions.get(symbol, 0)  # >0 long, <0 short, 0 flat
+        pos = self.positions[sid]  # >0 long, <0 short, 0 flat
 
         # ---------- ENTRY / EXIT LOGIC (matches my NVDA backtest) ----------
-
-        # Open LONG
-        if pos == 0 and num_buy >= 2 and num_sell == 0:
-            self._open_position(symbol, "BUY", price, tick.timestamp)
-            return
-
-        # Close LONG
-        if pos > 0 and num_sell >= 2:
-            self._close_position(symbol, price, tick.timestamp)
-            return
-
-        # Open SHORT
-        if pos == 0 and num_sell >= 2 and num_buy == 0:
-            self._open_position(symbol, "SELL", price, tick.timestamp)
-            return
-
-        # Close SHORT
-        if pos < 0 and num_buy >= 2:
-            self._close_position(symbol, price, tick.timestamp)
-            return
+        # The decision itself is pure arithmetic, so it lives in the
+        # (optionally numba-compiled) _decide_action kernel.
+        action = _decide_action(pos, num_buy, num_sell)
+        if action == 1:
+            self._open_position(sid, "BUY", price, ts)
+        elif action == 2:
+            self._close_position(sid, price, ts)
+        elif action == 3:
+            self._open_position(sid, "SELL", price, ts)
+        elif action == 4:
+            self._close_position(sid, price, ts)
 
     # ---------- end-of-backtest helpers ----------
 
@@ -177,27 +326,21 @@ class BacktestEngine:
         Call this once AFTER the generator is exhausted.
         Closes any open positions at the last seen price.
         """
-        for symbol, qty in list(self.positions.items()):
-            if qty == 0:
-                continue
-            price = self.last_price.get(symbol)
-            ts = self.last_timestamp.get(symbol)
-            if price is None or ts is None:
+        # only symbols that actually hold a position, not the whole universe
+        for sid in sorted(self._open_sids):
+            ts = self.last_timestamp[sid]
+            if ts is None:
                 continue
-            self._close_position(symbol, price, ts)
+            self._close_position(sid, self.last_price[sid], ts)
 
     def portfolio_value(self) -> float:
         """
         Current portfolio value (cash + mark-to-market of open positions).
-        Uses last seen price for each symbol.
+        Uses last seen price for each symbol; the mark-to-market sum is
+        maintained incrementally, so this is O(1) even though it is called
+        on every new-trade decision.
         """
-        value = self.cash
-        for symbol, qty in self.positions.items():
-            if qty == 0:
-                continue
-            price = self.last_price.get(symbol, self.entry_price.get(symbol, 0.0))
-            value += qty * price
-        return value
+        return self.cash + self._mtm
 
     def summary(self) -> None:
         realized_pnl = sum(t.pnl for t in self.trades)
@@ -211,8 +354,17 @@ class BacktestEngine:
 # this assumes we already have the data dowloaded as CSVs in the data/ folder
 # please use data_loader.py to download data if you don't have it yet
 
-def run_backtest():
-    
+def run_backtest(precompute_indicators: bool = False):
+    """
+    Run the multi-asset streaming backtest.
+
+    With precompute_indicators=True the RSI/BB/Zscore directions are computed
+    per symbol in one vectorized pass up front (see vector_backtest) and the
+    engine replays them, which removes all per-tick pandas_ta work. Note the
+    precomputed signals use the full price series, while the streaming
+    strategies only see their truncated trailing window.
+    """
+
     # 1) Define your universe (must match your saved CSV filenames)
     STOCK_UNIVERSE = [
     # Mega-cap tech
@@ -269,65 +421,90 @@ def run_backtest():
     strategies_by_symbol: dict[str, list] = {}
     all_frames: list[pd.DataFrame] = []
 
-    # 3) For each symbol: load data, build strategies, and stash df for the global timeline
-    for sym in UNIVERSE:
-        df = loader.load_data(sym)
-
-        if df is None:
-            continue  # missing or empty data, skip this symbol
+    # 3) Load all symbols concurrently, then build strategies and stash each
+    # df for the global timeline (missing/empty symbols are already skipped)
+    frames_by_symbol = loader.load_many(UNIVERSE)
 
-        # just in case: ensure symbol column is correct
+    for sym, df in frames_by_symbol.items():
+        # just in case: ensure symbol column is correct. load_data already
+        # adds it, and the frame is private to this run, so assign in place
+        # instead of copying the whole frame first.
         if "symbol" not in df.columns:
-            df = df.copy()
             df["symbol"] = sym
 
         all_frames.append(df)
 
-        # One set of strategies per symbol, exactly as before
-        rsi = RSI(period=3, overbought=80.0, oversold=20.0)
-        bb  = BB(period=20, std=2.0)
-        zs  = Zscore(period=60, std=2.0)
-
-        strategies_by_symbol[sym] = [rsi, bb, zs]
+        if precompute_indicators:
+            # vectorized cold-start: one indicator pass per symbol, replayed
+            # tick by tick during streaming
+            from vector_backtest import PrecomputedDirections, compute_directions
+
+            directions = compute_directions(df["close"])
+            strategies_by_symbol[sym] = [
+                PrecomputedDirections(directions[:, 0]),
+                PrecomputedDirections(directions[:, 1]),
+                PrecomputedDirections(directions[:, 2]),
+            ]
+        else:
+            # One set of strategies per symbol, exactly as before
+            strategies_by_symbol[sym] = make_strategy_triplet()
 
     if not strategies_by_symbol or not all_frames:
         print("No symbols with usable data. Exiting.")
         return
 
-    # 4) Build ONE combined time-ordered DataFrame of all ticks
+    # 4) Build ONE combined time-ordered DataFrame of all ticks.
+    # Each per-symbol frame is already sorted, so a *stable* argsort over the
+    # concatenated timestamps degenerates into a k-way merge of sorted runs
+    # (timsort) instead of a full quicksort, and keeps the symbol interleave
+    # deterministic for equal timestamps.
     all_data = pd.concat(all_frames)
-    all_data = all_data.sort_index()  # sort by timestamp
+    order = all_data.index.to_numpy().argsort(kind="stable")
+    all_data = all_data.take(order)
+
+    # 5) Create gateway + engine (sharing the gateway's symbol-id table)
+    gateway = DataGateway(all_data)  # your tick generator
 
-    # 5) Create engine
     engine = BacktestEngine(
         strategies_by_symbol=strategies_by_symbol,
         initial_capital=100_000.0,
         notional_frac_per_trade=0.02,
+        symbol_table=gateway.symbol_table,
     )
 
-    gateway = DataGateway(all_data)  # your tick generator
-
     # 6) Drive engine once over the *global* tick stream
 
+    engine.reserve(len(all_data))
     for tick in gateway.stream_data():
         engine.on_tick(tick)
         # record cash after each tick
-        engine.history.append((tick.timestamp, engine.cash))
+        engine.record_history(tick[0])
 
     # 7) Finalize and print summary
     engine.finalize()
     engine.summary()
 
-    # create trades dataframe for analysis
-    trades_df = pd.DataFrame([t.__dict__ for t in engine.trades])
+    # create trades dataframe for analysis (timestamps come out of the hot
+    # path as int64 nanoseconds; convert them back in one vectorized pass)
+    # Trade is slotted, so go through asdict rather than __dict__
+    trades_df = pd.DataFrame([asdict(t) for t in engine.trades])
+    if not trades_df.empty:
+        trades_df["timestamp"] = pd.to_datetime(trades_df["timestamp"], utc=True)
+        if gateway.index_tz is not None:
+            trades_df["timestamp"] = trades_df["timestamp"].dt.tz_convert(gateway.index_tz)
 
     # create cash history dataframe for analysis
-    cash_history_df = pd.DataFrame(engine.history, columns=["timestamp", "cash"])
-    cash_history_df.set_index("timestamp", inplace=True)
-
-    # export to CSV to output folder
-    trades_df.to_csv("output/backtest_trades_log.csv", index=False)
-    cash_history_df.to_csv("output/backtest_cash_history.csv", index=True)
+    cash_history_df = engine.history_frame(tz=gateway.index_tz)
+
+    # export to the output folder. Parquet is both faster to write and
+    # faster to load back for analysis than CSV; fall back to CSV when
+    # pyarrow is unavailable.
+    try:
+        trades_df.to_parquet("output/backtest_trades_log.parquet", index=False)
+        cash_history_df.to_parquet("output/backtest_cash_history.parquet", index=True)
+    except ImportError:
+        trades_df.to_csv("output/backtest_trades_log.csv", index=False)
+        cash_history_df.to_csv("output/backtest_cash_history.csv", index=True)
 
 if __name__ == "__main__":
     run_backtest()
\ No newline at end of file
@@ -1,31 +1,117 @@
+import csv
+import sys
+from datetime import datetime, timezone
+
 import pandas as pd
-from models import MarketData
+from models import TickView
 
 
 class DataGateway:
     """
     Gateway that takes a cleaned DataFrame with data and has a generator to stream MarketDataPoint objects.
+
+    Column data is extracted once into NumPy arrays at construction time so the
+    generator never touches pandas row objects (iterrows builds a Series per row,
+    which dominates the per-tick cost on long streams).
     """
 
     def __init__(self, df: pd.DataFrame):
-        self._df = df.sort_index() # ensure sorted by timestamp
-        
+        # ensure sorted by timestamp (skip the copy if the caller already
+        # merged the frames in time order)
+        if not df.index.is_monotonic_increasing:
+            df = df.sort_index()
+        self._df = df
+
+        # Precompute column arrays once; stream_data indexes into these directly.
+        # Datetime indexes are flattened to raw int64 nanoseconds since epoch:
+        # comparing/storing plain ints on the hot path is much cheaper than
+        # Timestamp objects. index_tz keeps the timezone so callers can
+        # reconstruct proper timestamps at export time.
+        if isinstance(df.index, pd.DatetimeIndex):
+            self._ts = df.index.as_unit('ns').asi8
+            self.index_tz = df.index.tz
+        else:
+            self._ts = df.index.to_numpy()
+            self.index_tz = None
+        self._close = df['close'].to_numpy()
+        self._open = df['open'].to_numpy()
+        self._high = df['high'].to_numpy()
+        self._low = df['low'].to_numpy()
+        self._volume = df['volume'].to_numpy()
+
+        if 'symbol' in df.columns:
+            # intern symbols to small integer ids once, so per-tick consumers
+            # can index arrays instead of hashing strings
+            codes, table = pd.factorize(df['symbol'].to_numpy())
+            self._sym_codes = codes
+            # sys.intern the table so downstream dict lookups keyed on the
+            # yielded symbol short-circuit on pointer equality
+            self._symbols = tuple(sys.intern(str(s)) for s in table)
+            self.symbol_table: tuple[str, ...] = self._symbols
+        else:
+            self._sym_codes = None
+            self._symbols = None
+            self.symbol_table = ()
+
     def stream_data(self):
         """ Generator that yields one MarketDataPoint at a time."""
-        for index, row in self._df.iterrows():
-            # per row symbol extraction
-            symbol = row['symbol'] if 'symbol' in row.index else None
-            
-            yield MarketData(
-                timestamp=index,
-                symbol=symbol,
-                close_price=row['close'],
-                open_price=row['open'],
-                high_price=row['high'],
-                low_price=row['low'],
-                volume=row['volume']
+        symbols = self._symbols
+        codes = self._sym_codes
+        ts, close = self._ts, self._close
+        open_, high, low, volume = self._open, self._high, self._low, self._volume
+
+        for i in range(len(ts)):
+            sid = codes[i] if codes is not None else None
+            yield TickView(
+                ts[i],
+                symbols[sid] if sid is not None else None,
+                close[i],
+                open_[i],
+                high[i],
+                low[i],
+                volume[i],
+                sid,
+            )
+
+def stream_ticks_from_csv(path: str, symbol: str | None = None):
+    """
+    Pure-Python streaming loader: yields TickView ticks straight out of a
+    CSV with the stdlib csv module, without materializing a DataFrame.
+    Useful when memory is tight or when running the tick driver under PyPy,
+    where pandas is the heavyweight dependency.
+
+    Timestamps are emitted as int64 nanoseconds (UTC), matching DataGateway.
+    `symbol` is used when the file has no symbol column.
+    """
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        col = {name: i for i, name in enumerate(header)}
+        i_ts = col.get("timestamp", 0)
+        i_close = col["close"]
+        i_open = col["open"]
+        i_high = col["high"]
+        i_low = col["low"]
+        i_volume = col["volume"]
+        i_sym = col.get("symbol")
+
+        for row in reader:
+            ts = datetime.fromisoformat(row[i_ts])
+            if ts.tzinfo is None:
+                ts = ts.replace(tzinfo=timezone.utc)
+            ts_ns = int(ts.timestamp() * 1_000_000) * 1_000
+            yield TickView(
+                ts_ns,
+                row[i_sym] if i_sym is not None else symbol,
+                float(row[i_close]),
+                float(row[i_open]),
+                float(row[i_high]),
+                float(row[i_low]),
+                float(row[i_volume]),
+                None,
             )
 
+
 if __name__ == "__main__":
     # Example usage
     df = pd.read_csv('data/NVDA_data.csv', index_col='timestamp', parse_dates=True)
@@ -36,4 +122,3 @@ if __name__ == "__main__":
         i += 1
         if i >= 5:
             break
-
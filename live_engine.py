@@ -1,10 +1,36 @@
 from __future__ import annotations
 import os
 import csv
+import asyncio
+import logging
+import logging.handlers
+import queue
+import threading
+from collections import deque
 
 from models import MarketData, Strategy
 from my_alpaca import AlpacaAPI
 
+logger = logging.getLogger("live_engine")
+
+
+def _start_log_listener() -> logging.handlers.QueueListener | None:
+    """
+    Route engine log records through a queue drained by a background
+    thread. stdout writes can block when piped to a slow collector;
+    with this setup the websocket callbacks only enqueue a record.
+    Idempotent: a second engine reuses the existing handler.
+    """
+    if logger.handlers:
+        return None
+    q = queue.SimpleQueue()
+    logger.addHandler(logging.handlers.QueueHandler(q))
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    listener = logging.handlers.QueueListener(q, logging.StreamHandler())
+    listener.start()
+    return listener
+
 
 class LiveTradingEngine:
     """
@@ -33,56 +59,127 @@ class LiveTradingEngine:
         self.alpaca = alpaca
         self.strategies_by_symbol = strategies_by_symbol
         self.notional_frac_per_trade = notional_frac_per_trade
-        # persistent order log
+        # classify the universe once; membership test beats re-scanning
+        # the symbol string ('/' in symbol) at every call site per tick
+        self._crypto_symbols = frozenset(s for s in strategies_by_symbol if "/" in s)
+        # tuple of pre-bound generate_signals per symbol: on_tick iterates
+        # callables directly instead of resolving the method per strategy
+        self._signal_fns = {
+            sym: tuple(s.generate_signals for s in strats)
+            for sym, strats in strategies_by_symbol.items()
+        }
+        # pre-bound Alpaca methods: skips the self.alpaca.<name> descriptor
+        # walk on every per-tick call
+        self._get_account = alpaca.get_account
+        self._get_pos = alpaca.get_position
+        self._submit = alpaca.submit_market_order
+        # persistent order log: the file handle and DictWriter are opened
+        # once (lazily) and reused, instead of open/close per order event
         os.makedirs("output", exist_ok=True)
         self.order_log_path = "output/live_order_updates.csv"
-
-    @staticmethod
-    def _direction_from_signals(signals: list[tuple]) -> int:
-        """
-        Reduce a list of (action, symbol, price, ts) to +1 / -1 / 0 for THIS bar.
-        If multiple signals appear in one bar, use the last one (same as backtest).
-        """
-        if not signals:
-            return 0
-        last_action = signals[-1][0]  # +1 (BUY), -1 (SELL)
-        return int(last_action)
-
-    def _get_position_side(self, symbol: str) -> int:
+        self._order_log_file = None
+        self._order_log_writer = None
+        self._order_log_fields = [
+            "event",
+            "order_id",
+            "symbol",
+            "side",
+            "status",
+            "filled_quantity",
+            "avg_price",
+            "submitted_at",
+            "filled_at",
+        ]
+        # ring buffer decoupling the websocket callback from disk I/O:
+        # handle_order_update only appends; a background task (or the
+        # high-watermark fallback) batches rows out to the CSV
+        self._order_ring = deque(maxlen=4096)
+        self._order_ring_highwater = 1024
+        # the high-watermark flush runs on the trading-stream's executor
+        # thread while the periodic flusher runs on the event loop, so the
+        # drain (and lazy writer creation) is serialized, as in OrderLogger
+        self._order_log_lock = threading.Lock()
+        self.order_log_flush_interval = 0.25  # seconds
+        self._log_listener = _start_log_listener()
+
+    def _get_order_log_writer(self) -> csv.DictWriter:
+        """Open the order log once and keep the writer for the engine's lifetime."""
+        if self._order_log_writer is None:
+            write_header = not (
+                os.path.isfile(self.order_log_path) and os.path.getsize(self.order_log_path) > 0
+            )
+            self._order_log_file = open(self.order_log_path, mode="a", newline="")
+            self._order_log_writer = csv.DictWriter(self._order_log_file, fieldnames=self._order_log_fields)
+            if write_header:
+                self._order_log_writer.writeheader()
+        return self._order_log_writer
+
+    def _flush_order_log(self) -> None:
+        """Drain buffered order-update records to the CSV in one batch."""
+        if not self._order_ring:
+            return
+        with self._order_log_lock:
+            writer = self._get_order_log_writer()
+            while self._order_ring:
+                writer.writerow(self._order_ring.popleft())
+            self._order_log_file.flush()
+
+    async def run_order_log_flusher(self) -> None:
+        """Background task: flush the order-log ring buffer periodically."""
+        while True:
+            await asyncio.sleep(self.order_log_flush_interval)
+            self._flush_order_log()
+
+    def close_order_log(self) -> None:
+        """Flush and close the order log (call on shutdown)."""
+        self._flush_order_log()
+        with self._order_log_lock:
+            if self._order_log_file is not None:
+                self._order_log_file.close()
+                self._order_log_file = None
+                self._order_log_writer = None
+
+    def _get_position(self, symbol: str) -> tuple[int, object | None]:
         """
-        Query Alpaca for current position in this symbol.
-        Returns:
+        Query Alpaca for the current position in this symbol.
+        Returns (side, position):
             0  -> flat
             +1 -> net long
             -1 -> net short
+        The position object is passed along so the close path doesn't have
+        to re-fetch it (one REST round-trip saved per close).
         """
-        pos = self.alpaca.get_position(symbol)
+        pos = self._get_pos(symbol)
         if pos is None:
-            return 0
+            return 0, None
 
         side = getattr(pos, "side", "").lower()
         if side == "long":
-            return 1
+            return 1, pos
         if side == "short":
-            return -1
-        return 0
+            return -1, pos
+        return 0, pos
     
     def _position_size(self, symbol: str, price: float, side: str) -> float:
         """
         Position sizing based on *current* portfolio value from Alpaca.
         For BUY, we also cap by available cash.
+
+        Equity and cash come off a single account fetch: they live on the
+        same REST payload, so asking twice just doubles the round-trips.
         """
-        port_val = self.alpaca.get_portfolio_value()
-        notional_target = port_val * self.notional_frac_per_trade
+        acct = self._get_account()
+        notional_target = float(acct.equity) * self.notional_frac_per_trade
         if notional_target <= 0:
             return 0.0
-        
-        is_crypto = "/" in symbol
+
+        is_crypto = symbol in self._crypto_symbols
 
         if is_crypto:
-            # For crypto, Alpaca allows fractional qty
-            qty = notional_target / price
-            qty = round(qty, 6)  # round to 6 decimal places
+            # For crypto, Alpaca allows fractional qty. Floor to whole
+            # micro-units (1e-6) so the quantity is exactly representable
+            # and never rounds up past the notional target
+            qty = int(notional_target / price * 1e6) / 1e6
         else:
             qty = int(notional_target // price)
         
@@ -90,9 +187,9 @@ class LiveTradingEngine:
             return 0.0
 
         if side.lower() == "buy":
-            cash = self.alpaca.get_cash()
+            cash = float(acct.cash)
             if is_crypto:
-                max_affordable = round(cash / price, 6)
+                max_affordable = int(cash / price * 1e6) / 1e6
             else:
                 max_affordable = int(cash // price)
             
@@ -109,42 +206,44 @@ class LiveTradingEngine:
         side = side.lower()
         qty = self._position_size(symbol, price, side)
         if qty <= 0:
-            print(f"[LIVE] {ts} {symbol}: size=0, not sending {side} order.")
+            logger.info(f"[LIVE] {ts} {symbol}: size=0, not sending {side} order.")
             return
-        
-        is_crypto = "/" in symbol
+
+        is_crypto = symbol in self._crypto_symbols
 
         if is_crypto:
             order_qty = float(qty)
         else:
             order_qty = int(qty)
 
-        order = self.alpaca.submit_market_order(symbol=symbol, qty=order_qty, side=side)
+        order = self._submit(symbol=symbol, qty=order_qty, side=side)
         oid = getattr(order, "id", None)
-        print(f"[LIVE] {ts} OPEN {side.upper()} {order_qty} {symbol} @ mkt (order_id={oid})")
+        logger.info(f"[LIVE] {ts} OPEN {side.upper()} {order_qty} {symbol} @ mkt (order_id={oid})")
     
-    def _close_position(self, symbol: str, ts) -> None:
+    def _close_position(self, symbol: str, ts, pos=None) -> None:
         """
         Close the *entire* position in this symbol via Alpaca.
+        Pass the already-fetched position object to skip a second lookup.
         """
-        pos = self.alpaca.get_position(symbol)
         if pos is None:
-            print(f"[LIVE] {ts} {symbol}: no position to close.")
+            pos = self._get_pos(symbol)
+        if pos is None:
+            logger.info(f"[LIVE] {ts} {symbol}: no position to close.")
             return
-        
-        is_crypto = "/" in symbol
+
+        is_crypto = symbol in self._crypto_symbols
 
         # let alpaca handle qty formatting
         if is_crypto:
             resp = self.alpaca.close_position(symbol)
             oid = getattr(resp, "id", None)
-            print(f"[LIVE] {ts} CLOSE {symbol}: market close (order_id={oid})")
+            logger.info(f"[LIVE] {ts} CLOSE {symbol}: market close (order_id={oid})")
             return
         
         # keep old logic for stocks
         qty = float(pos.qty)
         if qty <= 0:
-            print(f"[LIVE] {ts} {symbol}: position qty={qty}, nothing to close.")
+            logger.info(f"[LIVE] {ts} {symbol}: position qty={qty}, nothing to close.")
             return
 
         if not is_crypto:
@@ -153,9 +252,9 @@ class LiveTradingEngine:
         side_str = getattr(pos, "side", "").lower()
         close_side = "sell" if side_str == "long" else "buy"
 
-        order = self.alpaca.submit_market_order(symbol=symbol, qty=qty, side=close_side)
+        order = self._submit(symbol=symbol, qty=qty, side=close_side)
         oid = getattr(order, "id", None)
-        print(f"[LIVE] {ts} CLOSE {symbol}: {close_side.upper()} {qty} @ mkt (order_id={oid})")
+        logger.info(f"[LIVE] {ts} CLOSE {symbol}: {close_side.upper()} {qty} @ mkt (order_id={oid})")
 
     # ---------- main bar handler ----------
 
@@ -168,26 +267,28 @@ class LiveTradingEngine:
         price = float(tick.close_price)
         ts = tick.timestamp
 
-        strat_list = self.strategies_by_symbol.get(symbol)
-        if not strat_list:
+        signal_fns = self._signal_fns.get(symbol)
+        if not signal_fns:
             return
 
-        # 1) Ask each strategy for its signal on this tick
-        directions: list[int] = []
-        for strat in strat_list:
-            sigs = strat.generate_signals(tick)  # list[(action, sym, price, ts)]
-            dir_ = self._direction_from_signals(sigs)  # -1, 0, +1
-            directions.append(dir_)
-
-        num_buy = sum(1 for d in directions if d == 1)
-        num_sell = sum(1 for d in directions if d == -1)
+        # 1) Ask each strategy for its signal and tally votes in one pass
+        #    (last signal of the bar wins, same as backtest)
+        num_buy = 0
+        num_sell = 0
+        for fn in signal_fns:
+            sigs = fn(tick)  # list[(action, sym, price, ts)]
+            if not sigs:
+                continue
+            action = sigs[-1][0]  # +1 (BUY), -1 (SELL)
+            num_buy += action == 1
+            num_sell += action == -1
 
         if num_buy == 0 and num_sell == 0:
             return
 
         # 2) Get *current* position from Alpaca
-        pos = self._get_position_side(symbol)  # >0 long, <0 short, 0 flat
-        is_crypto = "/" in symbol
+        pos, pos_obj = self._get_position(symbol)  # >0 long, <0 short, 0 flat
+        is_crypto = symbol in self._crypto_symbols
 
         # ---------- ENTRY / EXIT LOGIC (same as backtest) ----------
         #
@@ -208,12 +309,12 @@ class LiveTradingEngine:
 
         if pos > 0:
             if num_sell >= 2:
-                self._close_position(symbol, ts)
+                self._close_position(symbol, ts, pos_obj)
             return
 
         if pos < 0:
             if num_buy >= 2:
-                self._close_position(symbol, ts)
+                self._close_position(symbol, ts, pos_obj)
             return
 
     # ---------- order updates (from TradingStream) ----------
@@ -223,42 +324,31 @@ class LiveTradingEngine:
         Simple logger for order/fill events from Alpaca's TradingStream.
         """
         try:
-            event = getattr(update, "event", None)
-            order = getattr(update, "order", None)
-
-            symbol = getattr(order, "symbol", None) if order else None
-            side = getattr(order, "side", None) if order else None
-            filled_qty = getattr(order, "filled_qty", None) if order else None
-            avg_price = getattr(order, "filled_avg_price", None) if order else None
-            status = getattr(order, "status", None) if order else None
-            oid = getattr(order, "id", None) if order else None
-            submitted_at = getattr(order, "submitted_at", None) if order else None
-            filled_at    = getattr(order, "filled_at", None) if order else None
-
+            # TradeUpdate/Order are well-defined models, so read the
+            # attributes directly; the outer except catches odd payloads
+            order = update.order
             record = {
-                "event": event,
-                "order_id": oid,
-                "symbol": symbol,
-                "side": side,
-                "status": status,
-                "filled_quantity": filled_qty,
-                "avg_price": avg_price,
-                "submitted_at": submitted_at,
-                "filled_at": filled_at,
+                "event": update.event,
+                "order_id": order.id,
+                "symbol": order.symbol,
+                "side": order.side,
+                "status": order.status,
+                "filled_quantity": order.filled_qty,
+                "avg_price": order.filled_avg_price,
+                "submitted_at": order.submitted_at,
+                "filled_at": order.filled_at,
             }
 
-            # Append to CSV log
-            file_exists = os.path.isfile(self.order_log_path)
-            with open(self.order_log_path, mode="a", newline="") as f:
-                writer = csv.DictWriter(f, fieldnames=record.keys())
-                if not file_exists:
-                    writer.writeheader()
-                writer.writerow(record)
-
-            print(
-                f"[ORDER UPDATE] event={event} "
-                f"symbol={symbol} side={side} status={status} "
-                f"filled={filled_qty} avg_price={avg_price} id={oid}"
+            # Buffer the record; the flusher task writes it out in batches
+            # so this callback never touches disk on the happy path
+            self._order_ring.append(record)
+            if len(self._order_ring) >= self._order_ring_highwater:
+                self._flush_order_log()
+
+            logger.info(
+                f"[ORDER UPDATE] event={record['event']} "
+                f"symbol={record['symbol']} side={record['side']} status={record['status']} "
+                f"filled={record['filled_quantity']} avg_price={record['avg_price']} id={record['order_id']}"
             )
         except Exception as e:
-            print(f"[ORDER UPDATE] raw={update} (parse error: {e})")
\ No newline at end of file
+            logger.info(f"[ORDER UPDATE] raw={update} (parse error: {e})")
\ No newline at end of file
@@ -1,4 +1,5 @@
 import csv
+import threading
 from pathlib import Path
 from datetime import datetime
 
@@ -25,10 +26,14 @@ class OrderLogger:
             "filled_quantity",
             "reason",
         ]
-        if not self._path.exists():
-            with self._path.open("w", newline="") as f:
-                writer = csv.DictWriter(f, fieldnames=self._fieldnames)
-                writer.writeheader()
+        write_header = not self._path.exists()
+        # keep the file open for the logger's lifetime instead of
+        # reopening it (and rebuilding a DictWriter) on every log call
+        self._fh = self._path.open("a", newline="", buffering=1)
+        self._writer = csv.DictWriter(self._fh, fieldnames=self._fieldnames)
+        self._lock = threading.Lock()
+        if write_header:
+            self._writer.writeheader()
 
     def log(self, order: "Order", event: str, **extra) -> None:
         """
@@ -52,6 +57,15 @@ class OrderLogger:
             "reason": None,
         }
         row.update({k: v for k, v in extra.items() if k in self._fieldnames})
-        with self._path.open("a", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=self._fieldnames)
-            writer.writerow(row)
+        with self._lock:
+            self._writer.writerow(row)
+
+    def close(self) -> None:
+        """Close the underlying log file."""
+        self._fh.close()
+
+    def __enter__(self) -> "OrderLogger":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
@@ -1,9 +1,12 @@
 from dataclasses import dataclass
 from datetime import datetime
+from collections import namedtuple
 
 from abc import ABC, abstractmethod
 
-@dataclass(frozen=True)
+# slots=True drops the per-instance __dict__ (~3x smaller objects and
+# faster attribute reads) — this is allocated once per live bar
+@dataclass(frozen=True, slots=True)
 class MarketData:
     timestamp: datetime
     symbol: str
@@ -13,6 +16,25 @@ class MarketData:
     low_price: float
     volume: int
 
+# Lightweight tick view for the backtest hot path: a namedtuple is a plain
+# C-level tuple, so allocating millions of them is far cheaper than building
+# a MarketData dataclass per tick, and consumers can read fields positionally
+# (tick[0], tick[2], ...) while strategies keep attribute access.
+# `sid` is the small integer id the DataGateway assigns to each symbol
+# (factorized once per run); engines index their per-symbol state with it
+# instead of hashing symbol strings on every tick.
+TickView = namedtuple(
+    "TickView",
+    ["timestamp", "symbol", "close_price", "open_price", "high_price", "low_price", "volume", "sid"],
+    defaults=(None,),
+)
+
+# shared "no signal this tick" result: the overwhelming majority of
+# generate_signals calls emit nothing, so hand every caller the same
+# immutable empty tuple instead of allocating a fresh list per tick
+NO_SIGNALS: tuple = ()
+
+
 class Strategy(ABC):
     @abstractmethod
     def __init__(self):
@@ -21,7 +43,69 @@ class Strategy(ABC):
     @abstractmethod
     def generate_signals(self, tick: MarketData) -> list:
         pass
-@dataclass
+
+    def _regime_signals(self, value, upper, lower, exit_upper, exit_lower, tick) -> list:
+        """
+        Shared overbought/oversold regime state machine used by every
+        indicator strategy. `value` is the current indicator reading,
+        `upper`/`lower` the entry thresholds and `exit_upper`/`exit_lower`
+        the mean-reversion exit levels. Maintains the subclass state
+        (_flag, _was_overbought, _was_oversold, _last_action and the two
+        regime flags) and returns the (action, symbol, price, ts) signals.
+        Returns the shared NO_SIGNALS tuple when nothing fires, so the
+        common quiet tick allocates nothing.
+        """
+        # only start generating signals after the normal range was touched
+        if lower < value < upper:
+            self._flag = True
+        if not self._flag:
+            return NO_SIGNALS
+
+        # allocated lazily: most ticks fire neither branch
+        output = None
+
+        # overbought entry/exit
+        is_overbought = value > upper
+        overbought_closed = value < exit_upper
+        if self._was_overbought is not None and is_overbought != self._was_overbought:
+            if is_overbought and self._last_action != -1:
+                # just became overbought
+                self._last_action = -1  # SELL
+                self._overboughtregime = True
+                output = [(-1, tick.symbol, tick.close_price, tick.timestamp)]
+        if overbought_closed and self._last_action == -1 and self._overboughtregime:
+            # just exited overbought
+            self._last_action = 1  # BUY
+            self._overboughtregime = False
+            if output is None:
+                output = []
+            output.append((1, tick.symbol, tick.close_price, tick.timestamp))
+
+        # oversold entry/exit
+        is_oversold = value < lower
+        oversold_closed = value > exit_lower
+        if self._was_oversold is not None and is_oversold != self._was_oversold:
+            if is_oversold and self._last_action != 1:
+                # just became oversold
+                self._last_action = 1  # BUY
+                self._oversoldregime = True
+                if output is None:
+                    output = []
+                output.append((1, tick.symbol, tick.close_price, tick.timestamp))
+        if oversold_closed and self._last_action == 1 and self._oversoldregime:
+            # just exited oversold
+            self._last_action = -1  # SELL
+            self._oversoldregime = False
+            if output is None:
+                output = []
+            output.append((-1, tick.symbol, tick.close_price, tick.timestamp))
+
+        # update state for the next tick
+        self._was_overbought = is_overbought
+        self._was_oversold = is_oversold
+
+        return output if output is not None else NO_SIGNALS
+@dataclass(slots=True)
 class Trade:
     symbol: str
     timestamp: datetime
@@ -1,9 +1,13 @@
 from __future__ import annotations
 
-from datetime import datetime, time, timedelta, UTC
+from datetime import datetime, timedelta, UTC
+from time import monotonic
 import os
-import asyncio 
+import asyncio
+import socket
+from concurrent.futures import ThreadPoolExecutor
 
+import numpy as np
 import pandas as pd
 from dotenv import load_dotenv
 
@@ -24,6 +28,38 @@ from alpaca.data.timeframe import TimeFrame
 from alpaca.data.live import StockDataStream, CryptoDataStream
 
 
+def _tune_stream_socket(stream) -> None:
+    """
+    Best-effort TCP tuning of a connected Alpaca stream:
+    TCP_NODELAY so small frames aren't held back by Nagle, plus
+    SO_KEEPALIVE. Recent websockets versions already set NODELAY,
+    so this is a no-op there; any failure is silently ignored.
+    """
+    try:
+        ws = getattr(stream, "_ws", None)
+        transport = getattr(ws, "transport", None)
+        sock = transport.get_extra_info("socket") if transport is not None else None
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    except Exception:
+        pass
+
+
+def _install_socket_tuning(stream) -> None:
+    """Wrap the stream's connect step so the socket is tuned once it's up."""
+    connect = getattr(stream, "_connect", None)
+    if connect is None:
+        return
+
+    async def tuned_connect(*args, **kwargs):
+        result = await connect(*args, **kwargs)
+        _tune_stream_socket(stream)
+        return result
+
+    stream._connect = tuned_connect
+
+
 class AlpacaAPI:
     """
     Wrapper around alpaca-py trading + data + streaming.
@@ -53,13 +89,32 @@ class AlpacaAPI:
         self._crypto_stream: CryptoDataStream | None = None
         self._trading_stream: TradingStream | None = None
 
+        # --- Account cache ---
+        # equity/cash/portfolio value all come from the same REST endpoint;
+        # without a cache every tick that trades pays several round-trips.
+        # The cache is invalidated whenever we send an order.
+        self.account_cache_ttl = 1.0  # seconds
+        self._account_cache = None
+        self._account_cache_at = 0.0
+
     # =====================================================
     #                   TRADING HELPERS
     # =====================================================
 
     def get_account(self):
-        """Return Alpaca account object."""
-        return self.trading.get_account()
+        """
+        Return Alpaca account object, cached for up to account_cache_ttl
+        seconds (set the ttl to 0 to force a round-trip every call).
+        """
+        now = monotonic()
+        if self._account_cache is None or now - self._account_cache_at > self.account_cache_ttl:
+            self._account_cache = self.trading.get_account()
+            self._account_cache_at = now
+        return self._account_cache
+
+    def _invalidate_account_cache(self) -> None:
+        """Drop the cached account state (after anything that changes it)."""
+        self._account_cache = None
 
     def get_equity(self) -> float:
         """Current equity (string in API -> float here)."""
@@ -128,6 +183,7 @@ class AlpacaAPI:
             side=side_enum,
             time_in_force=tif,
         )
+        self._invalidate_account_cache()
         return self.trading.submit_order(order)
 
     def close_position(self, symbol: str):
@@ -140,6 +196,7 @@ class AlpacaAPI:
         else:
             norm_symbol = symbol
 
+        self._invalidate_account_cache()
         try:
             return self.trading.close_position(norm_symbol)
         except Exception as e:
@@ -148,6 +205,7 @@ class AlpacaAPI:
 
     def close_all_positions(self):
         """Close all open positions at market."""
+        self._invalidate_account_cache()
         try:
             return self.trading.close_all_positions(cancel_orders=True)
         except Exception as e:
@@ -163,6 +221,7 @@ class AlpacaAPI:
     def _ensure_stock_stream(self) -> StockDataStream:
         if self._stock_stream is None:
             self._stock_stream = StockDataStream(self.api_key, self.secret_key)
+            _install_socket_tuning(self._stock_stream)
         return self._stock_stream
 
     def subscribe_stock_bars(self, symbols: list[str], on_bar):
@@ -172,8 +231,9 @@ class AlpacaAPI:
         on_bar: async def(bar) or normal def(bar)
         """
         stream = self._ensure_stock_stream()
-        for sym in symbols:
-            stream.subscribe_bars(on_bar, sym)
+        # one call registers every symbol -> a single websocket SUBSCRIBE
+        # frame at connect time instead of one frame per symbol
+        stream.subscribe_bars(on_bar, *symbols)
 
     def run_stock_stream(self):
         """
@@ -186,16 +246,20 @@ class AlpacaAPI:
     async def run_stock_stream_async(self):
         """
         Async-friendly wrapper around run_stock_stream().
-        Runs Alpaca's blocking .run() in a background thread.
+        Runs Alpaca's blocking .run() on its own dedicated thread so the
+        streams never compete for the small shared default executor.
         """
         stream = self._ensure_stock_stream()
-        await asyncio.to_thread(stream.run)
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="alpaca-stock")
+        await loop.run_in_executor(executor, stream.run)
 
     # ---------- Crypto bars stream ----------
 
     def _ensure_crypto_stream(self) -> CryptoDataStream:
         if self._crypto_stream is None:
             self._crypto_stream = CryptoDataStream(self.api_key, self.secret_key)
+            _install_socket_tuning(self._crypto_stream)
         return self._crypto_stream
 
     def subscribe_crypto_bars(self, symbols: list[str], on_bar):
@@ -206,8 +270,8 @@ class AlpacaAPI:
         on_bar: async def(bar) or normal def(bar)
         """
         stream = self._ensure_crypto_stream()
-        for sym in symbols:
-            stream.subscribe_bars(on_bar, sym)
+        # single batched subscription, same as subscribe_stock_bars
+        stream.subscribe_bars(on_bar, *symbols)
 
     def run_crypto_stream(self):
         """Blocking call to start crypto data websocket."""
@@ -217,9 +281,12 @@ class AlpacaAPI:
     async def run_crypto_stream_async(self):
         """
         Async-friendly wrapper around run_crypto_stream().
+        Uses a dedicated single-worker thread (see run_stock_stream_async).
         """
         stream = self._ensure_crypto_stream()
-        await asyncio.to_thread(stream.run)
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="alpaca-crypto")
+        await loop.run_in_executor(executor, stream.run)
 
     # =====================================================
     #                 TRADING STREAM HELPERS
@@ -232,6 +299,7 @@ class AlpacaAPI:
                 self.secret_key,
                 paper=self.paper,
             )
+            _install_socket_tuning(self._trading_stream)
         return self._trading_stream
 
     def subscribe_order_updates(self, on_update):
@@ -251,16 +319,31 @@ class AlpacaAPI:
     async def run_trading_stream_async(self):
         """
         Async-friendly wrapper around run_trading_stream().
+        Uses a dedicated single-worker thread (see run_stock_stream_async).
         """
         ts = self._ensure_trading_stream()
-        await asyncio.to_thread(ts.run)
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="alpaca-trading")
+        await loop.run_in_executor(executor, ts.run)
 
 
     # =====================================================
     #                 HISTORICAL DATA HELPERS
     # =====================================================
 
-    def get_minute_bars(self, symbol: str, days: int = 1, limit: int | None = None):
+    def get_minute_bars(
+        self,
+        symbol: str,
+        days: int = 1,
+        limit: int | None = None,
+        convert_tz: bool = True,
+    ):
+        """
+        Minute bars for one symbol. With convert_tz=False the returned frame
+        keeps its original UTC index — rebasing a MultiIndex level is O(n)
+        and pointless for callers that work off the UTC timestamps anyway;
+        the regular-hours filter still uses New York wall-clock time.
+        """
         end = datetime.now(UTC) - timedelta(minutes=20) # buffer to ensure complete data
         start = end - timedelta(days=days)
 
@@ -284,7 +367,8 @@ class AlpacaAPI:
             if df.empty:
                 return df
             # convert timezone to Eastern Time
-            df = df.tz_convert('America/New_York', level='timestamp')
+            if convert_tz:
+                df = df.tz_convert('America/New_York', level='timestamp')
             return df   # pandas DataFrame
 
         else:
@@ -304,10 +388,86 @@ class AlpacaAPI:
             if df.empty:
                 return df
             # convert timezone to Eastern Time
-            df = df.tz_convert('America/New_York', level='timestamp')
-            # Filter only regular trading hours (9:30 AM to 4:00 PM EST)
-            ts = df.index.get_level_values("timestamp")
-            mask = (ts.time >= time(9, 30)) & (ts.time <= time(16, 0))
-            df = df[mask]
-            
-            return df   # pandas DataFrame
\ No newline at end of file
+            if convert_tz:
+                df = df.tz_convert('America/New_York', level='timestamp')
+                ts = df.index.get_level_values("timestamp")
+            else:
+                # convert only the flat level for the mask, never the frame
+                ts = df.index.get_level_values("timestamp").tz_convert("America/New_York")
+            # Filter only regular trading hours (9:30 AM to 4:00 PM EST).
+            # Integer hour/minute arithmetic avoids materializing an object
+            # array of datetime.time instances per row.
+            hhmm = ts.hour * 100 + ts.minute
+            mask = (hhmm >= 930) & (hhmm <= 1600)
+            # take() on the integer positions skips the MultiIndex
+            # alignment path that boolean indexing would go through
+            df = df.take(np.flatnonzero(mask))
+
+
+            return df   # pandas DataFrame
+
+    def get_minute_bars_multi(
+        self,
+        symbols: list[str],
+        days: int = 1,
+        limit: int | None = None,
+        convert_tz: bool = True,
+    ) -> dict[str, pd.DataFrame]:
+        """
+        Minute bars for many symbols in at most two batched requests (one
+        per asset class) instead of one round-trip per symbol. Timezone
+        conversion and the regular-hours mask run once over the combined
+        MultiIndex frame; the result is split per symbol at the end.
+        """
+        end = datetime.now(UTC) - timedelta(minutes=20)
+        start = end - timedelta(days=days)
+
+        stocks = [s for s in symbols if "/" not in s]
+        cryptos = [s for s in symbols if "/" in s]
+
+        out: dict[str, pd.DataFrame] = {}
+
+        if cryptos:
+            req = CryptoBarsRequest(
+                symbol_or_symbols=cryptos,
+                timeframe=TimeFrame.Minute,
+                start=start,
+                end=end,
+                limit=limit,
+            )
+            df = self.crypto_data.get_crypto_bars(req).df
+            if not df.empty:
+                if convert_tz:
+                    df = df.tz_convert('America/New_York', level='timestamp')
+                for sym in cryptos:
+                    try:
+                        out[sym] = df.xs(sym, level="symbol")
+                    except KeyError:
+                        pass  # no bars returned for this symbol
+
+        if stocks:
+            req = StockBarsRequest(
+                symbol_or_symbols=stocks,
+                timeframe=TimeFrame.Minute,
+                start=start,
+                end=end,
+                limit=limit,
+            )
+            df = self.stock_data.get_stock_bars(req).df
+            if not df.empty:
+                if convert_tz:
+                    df = df.tz_convert('America/New_York', level='timestamp')
+                    ts = df.index.get_level_values("timestamp")
+                else:
+                    ts = df.index.get_level_values("timestamp").tz_convert("America/New_York")
+                # same regular-hours mask as get_minute_bars, computed once
+                hhmm = ts.hour * 100 + ts.minute
+                mask = (hhmm >= 930) & (hhmm <= 1600)
+                df = df.take(np.flatnonzero(mask))
+                for sym in stocks:
+                    try:
+                        out[sym] = df.xs(sym, level="symbol")
+                    except KeyError:
+                        pass
+
+        return out
\ No newline at end of file
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 import asyncio
+import sys
 
 from my_alpaca import AlpacaAPI
-from strategies import RSI, BB, Zscore
+from strategies import make_strategy_triplet
 from models import MarketData
 from live_engine import LiveTradingEngine
 
@@ -58,39 +59,50 @@ CRYPTO_UNIVERSE = [
     "AVAX/USD",
 ]
 
+# intern the universe once so per-bar dict lookups on tick.symbol hit the
+# pointer-equality fast path instead of rehashing the string each time
+STOCK_UNIVERSE = [sys.intern(s) for s in STOCK_UNIVERSE]
+CRYPTO_UNIVERSE = [sys.intern(s) for s in CRYPTO_UNIVERSE]
+
 
 def bar_to_tick(bar) -> MarketData:
     """
     Convert an Alpaca bar object to your MarketData dataclass.
 
-    Handles both stock and crypto bars and a couple of possible attribute names.
-    Adjust if your Alpaca bar model uses different fields.
+    alpaca-py bars use one fixed schema (symbol/timestamp/open/high/low/
+    close/volume already typed as floats), so the fast path reads the
+    attributes directly — no getattr-with-default chain per field. The
+    fallback handles raw-feed bars with single-letter names.
     """
-    # symbol
-    symbol = getattr(bar, "symbol", None) or getattr(bar, "S", None)
-
-    # timestamp (Alpaca often uses 'timestamp' or 't')
-    ts = getattr(bar, "timestamp", None) or getattr(bar, "t", None)
+    try:
+        return MarketData(
+            symbol=sys.intern(bar.symbol),
+            open_price=bar.open,
+            high_price=bar.high,
+            low_price=bar.low,
+            close_price=bar.close,
+            volume=bar.volume,
+            timestamp=bar.timestamp,
+        )
+    except AttributeError:
+        pass
+
+    # raw-feed schema ('S', 't', 'o', 'h', 'l', 'c', 'v')
+    symbol = getattr(bar, "S", None)
+    ts = getattr(bar, "t", None)
+    close = getattr(bar, "c", None)
 
-    # OHLCV with fallbacks
-    close = getattr(bar, "close", None) or getattr(bar, "c", None)
-    open_ = getattr(bar, "open", None) or getattr(bar, "o", close)
-    high = getattr(bar, "high", None) or getattr(bar, "h", close)
-    low = getattr(bar, "low", None) or getattr(bar, "l", close)
-    vol = getattr(bar, "volume", None) or getattr(bar, "v", 0.0)
-
-    # Basic validation
     if symbol is None or ts is None or close is None:
         print(f"[WARN] Skipping malformed bar: {bar}")
         return None
 
     return MarketData(
-        symbol=symbol,
-        open_price=float(open_),
-        high_price=float(high),
-        low_price=float(low),
+        symbol=sys.intern(symbol),
+        open_price=float(getattr(bar, "o", close)),
+        high_price=float(getattr(bar, "h", close)),
+        low_price=float(getattr(bar, "l", close)),
         close_price=float(close),
-        volume=float(vol),
+        volume=float(getattr(bar, "v", 0.0)),
         timestamp=ts,
     )
 
@@ -103,10 +115,7 @@ async def main() -> None:
     strategies_by_symbol: dict[str, list] = {}
 
     for sym in STOCK_UNIVERSE + CRYPTO_UNIVERSE:
-        rsi = RSI(period=3, overbought=80.0, oversold=20.0)
-        bb = BB(period=20, std=2.0)
-        zs = Zscore(period=60, std=2.0)
-        strategies_by_symbol[sym] = [rsi, bb, zs]
+        strategies_by_symbol[sym] = make_strategy_triplet()
 
     # 3) Live engine
     engine = LiveTradingEngine(
@@ -117,26 +126,28 @@ async def main() -> None:
 
     # 4) Define callbacks that Alpaca streams will call
 
-    async def on_stock_bar(bar):
-        tick = bar_to_tick(bar)
-        if tick is None:
-            return
-        # defensive: only trade what we have strategies for
-        if tick.symbol in strategies_by_symbol:
-           try:
-               engine.on_tick(tick)
-           except Exception as e:
-               print(f"[ERROR] on_stock_bar: {e}")
+    # frozen membership gate for the hot path (cheaper than probing the
+    # strategies dict on every bar)
+    tradeable = frozenset(strategies_by_symbol)
 
-    async def on_crypto_bar(bar):
+    # one synchronous handler shared by both streams; the async wrappers
+    # below exist only because alpaca-py insists on coroutine callbacks
+    def _handle_bar(bar) -> None:
         tick = bar_to_tick(bar)
         if tick is None:
             return
-        if tick.symbol in strategies_by_symbol:
+        # defensive: only trade what we have strategies for
+        if tick.symbol in tradeable:
             try:
                 engine.on_tick(tick)
             except Exception as e:
-                print(f"[ERROR] on_crypto_bar: {e}")
+                print(f"[ERROR] bar handler: {e}")
+
+    async def on_stock_bar(bar):
+        _handle_bar(bar)
+
+    async def on_crypto_bar(bar):
+        _handle_bar(bar)
 
     async def on_order_update(update):
         try:
@@ -149,12 +160,13 @@ async def main() -> None:
     api.subscribe_crypto_bars(CRYPTO_UNIVERSE, on_crypto_bar)
     api.subscribe_order_updates(on_order_update)
 
-    # 6) Run all three websockets concurrently using asyncio
-    await asyncio.gather(
-        api.run_stock_stream_async(),
-        api.run_crypto_stream_async(),
-        api.run_trading_stream_async(),
-    )
+    # 6) Run all three websockets concurrently; TaskGroup cancels the
+    #    survivors if any stream dies instead of leaving them orphaned
+    async with asyncio.TaskGroup() as tg:
+        tg.create_task(api.run_stock_stream_async())
+        tg.create_task(api.run_crypto_stream_async())
+        tg.create_task(api.run_trading_stream_async())
+        tg.create_task(engine.run_order_log_flusher())
 
 
 if __name__ == "__main__":
@@ -1,21 +1,85 @@
+import math
+
+import numpy as np
 import pandas as pd
-import pandas_ta as ta
-from models import MarketData, Strategy
+from models import NO_SIGNALS, MarketData, Strategy
 from data_loader import DataLoader
 from data_stream import DataGateway
 
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
 # TODO: need to adjust the strategies for the fact that we cannot short crypto assets
 
+
+# --- per-tick indicator kernels ---
+# Module-level scalar/array functions so numba can JIT them; without numba
+# they run as plain Python, same as the kernels in backtest.py.
+
+def _rsi_step(delta: float, avg_gain: float, avg_loss: float, period: int, seeding: bool):
+    """One Wilder smoothing step; returns the updated (avg_gain, avg_loss)."""
+    gain = delta if delta > 0.0 else 0.0
+    loss = -delta if delta < 0.0 else 0.0
+    if seeding:
+        avg_gain += gain / period
+        avg_loss += loss / period
+    else:
+        avg_gain = (avg_gain * (period - 1) + gain) / period
+        avg_loss = (avg_loss * (period - 1) + loss) / period
+    return avg_gain, avg_loss
+
+
+def _roll_step(ring, slot: int, price: float, sum_: float, sumsq: float):
+    """Swap the oldest close out of the running sums; returns (sum, sumsq)."""
+    old = ring[slot]
+    ring[slot] = price
+    sum_ += price - old
+    sumsq += price * price - old * old
+    return sum_, sumsq
+
+
+def _bbp_from_sums(price: float, sum_: float, sumsq: float, period: int, std: float) -> float:
+    """Bollinger %B from running sums; NaN when the window is flat."""
+    mean = sum_ / period
+    var = (sumsq - sum_ * sum_ / period) / (period - 1)
+    if var <= 0.0:
+        return math.nan
+    band = std * math.sqrt(var)
+    return (price - (mean - band)) / (2.0 * band)
+
+
+def _z_from_sums(price: float, sum_: float, sumsq: float, period: int) -> float:
+    """Z-score from running sums; NaN when the window is flat."""
+    mean = sum_ / period
+    var = (sumsq - sum_ * sum_ / period) / (period - 1)
+    if var <= 0.0:
+        return math.nan
+    return (price - mean) / math.sqrt(var)
+
+
+if njit is not None:
+    _rsi_step = njit(cache=True)(_rsi_step)
+    _roll_step = njit(cache=True)(_roll_step)
+    _bbp_from_sums = njit(cache=True)(_bbp_from_sums)
+    _z_from_sums = njit(cache=True)(_z_from_sums)
+
 class RSI(Strategy):
 
     ''' Strategy that generates buy/sell signals based on RSI levels. '''
     
     def __init__(self, period: int = 3, overbought: float = 80.0, oversold: float = 20.0):
-        self._prices = pd.DataFrame(columns=['close'])
         self._period = period
         self._overbought = overbought
         self._oversold = oversold
         self._min_window = 20  # minimum data points to start generating signals (warm-up period)
+        # streaming Wilder RSI state: the average gain/loss recursion only
+        # needs three scalars, so no price buffer at all
+        self._prev_close = None
+        self._avg_gain = 0.0
+        self._avg_loss = 0.0
+        self._n = 0  # total ticks seen
         self._was_overbought = False
         self._was_oversold = False
         self._flag = False  # flag to start generating signals only after normal range touched
@@ -27,100 +91,62 @@ class RSI(Strategy):
 
         """ Generates buy/sell signals based on RSI levels."""
 
-        # add new price to DataFrame
-        self._prices.loc[len(self._prices), 'close'] = float(tick.close_price)
-        
-        # Not enough data needs to warm up
-        if len(self._prices) < self._min_window:
-            return []
-        
-        # drop old data to keep only necessary window
-        if len(self._prices) > self._min_window + 20:
-            self._prices = self._prices.iloc[-(self._min_window + 20):]
-
-        # FORCE numeric dtype for close (this is the key bit for Numba)
-        self._prices['close'] = pd.to_numeric(self._prices['close'], errors='coerce').astype('float64')
-        close = self._prices['close']
-
-        # calculate RSI
-        rsi_series = ta.rsi(close, length=self._period)
-        
-        # get current RSI value    
-        current_rsi = rsi_series.iloc[-1]
-        
-        # if current_rsi is NaN, cannot generate signal
-        if pd.isna(current_rsi):
-            return []
-
-        # set flag to start generating signals only after in the normal range
-        
-        if current_rsi < self._overbought and current_rsi > self._oversold:
-            self._flag = True
-
-        if not self._flag:
-            return []
-        
-        
-        # flag current overbought/oversold status
-        is_overbought = current_rsi > self._overbought
-
-        # exit overbought when RSI has mean-reverted 10 points inside the band (80 -> 70)
-        overbought_closed = current_rsi < self._overbought - 10            
+        price = float(tick.close_price)
 
-        output = []
+        # O(1) Wilder update: seed with a simple average over the first
+        # `period` deltas, then apply the recursive smoothing — identical
+        # maths to recomputing RSI over the history each tick
+        if self._prev_close is None:
+            self._prev_close = price
+            self._n = 1
+            return NO_SIGNALS
+        delta = price - self._prev_close
+        self._prev_close = price
+        self._n += 1
+
+        self._avg_gain, self._avg_loss = _rsi_step(
+            delta, self._avg_gain, self._avg_loss, self._period, self._n <= self._period + 1
+        )
+
+        # Not enough data needs to warm up
+        if self._n < self._min_window:
+            return NO_SIGNALS
+
+        # current RSI value from the running averages
+        if self._avg_loss > 0.0:
+            rs = self._avg_gain / self._avg_loss
+            current_rsi = 100.0 - 100.0 / (1.0 + rs)
+        elif self._avg_gain > 0.0:
+            current_rsi = 100.0
+        else:
+            # no movement either way yet: no meaningful signal
+            return NO_SIGNALS
+
+        # shared regime state machine: exit when RSI has mean-reverted
+        # 10 points inside the band (80 -> 70, 20 -> 30)
+        return self._regime_signals(
+            current_rsi,
+            self._overbought,
+            self._oversold,
+            self._overbought - 10,
+            self._oversold + 10,
+            tick,
+        )
 
-        # generate signal if crossing overbought thresholds
-        if self._was_overbought is not None and is_overbought != self._was_overbought:
-            if is_overbought and self._last_action != -1:
-                # just became overbought
-                action = -1  # SELL
-                self._last_action = action
-                self._overboughtregime = True
-                output.append((action, tick.symbol, tick.close_price, tick.timestamp))
-        
-        if overbought_closed and self._last_action == -1 and self._overboughtregime:
-            # just exited overbought
-            action = 1  # BUY
-            self._last_action = action
-            self._overboughtregime = False
-            output.append((action, tick.symbol, tick.close_price, tick.timestamp))
-
-        # generate signal if crossing oversold thresholds
-        is_oversold = current_rsi < self._oversold
-
-        # exit oversold when RSI has mean-reverted 10 points inside the band (20 -> 30)
-        oversold_closed = current_rsi > self._oversold + 10
-
-        if self._was_oversold is not None and is_oversold != self._was_oversold:
-            if is_oversold and self._last_action != 1:
-                # just became oversold
-                action = 1  # BUY
-                self._last_action = action
-                self._oversoldregime = True
-                output.append((action, tick.symbol, tick.close_price, tick.timestamp))
-        
-        if oversold_closed and self._last_action == 1 and self._oversoldregime:
-            # just exited oversold
-            action = -1  # SELL
-            self._last_action = action
-            self._oversoldregime = False
-            output.append((action, tick.symbol, tick.close_price, tick.timestamp))
-            
-        # Update state for next tick and return any signal
-        self._was_overbought = is_overbought
-        self._was_oversold = is_oversold
-        
-        return output
-    
 class BB(Strategy):
 
     ''' Strategy that generates buy/sell signals based on Bollinger Bands. '''
     
     def __init__(self, period: int = 20, std: float = 2.0):
-        self._prices = pd.DataFrame(columns=['close'])
         self._period = period
         self._std = std
         self._min_window = 35  # minimum data points to start generating signals (warm-up period)
+        # streaming Bollinger state: ring of the last `period` closes plus
+        # running sum / sum-of-squares for O(1) mean and std per tick
+        self._ring = np.zeros(period, dtype=np.float64)
+        self._sum = 0.0
+        self._sumsq = 0.0
+        self._n = 0  # total ticks seen
         self._was_overbought = False
         self._was_oversold = False
         self._flag = False  # flag to start generating signals only after normal range touched
@@ -132,88 +158,32 @@ class BB(Strategy):
 
         """ Generates buy/sell signals based on Bollinger Bands."""
 
-        # add new price to DataFrame pd concat
-        self._prices.loc[len(self._prices), 'close'] = float(tick.close_price)
-        
+        price = float(tick.close_price)
+
+        # O(1) update: swap the oldest close out of the running sums
+        p = self._period
+        self._sum, self._sumsq = _roll_step(self._ring, self._n % p, price, self._sum, self._sumsq)
+        self._n += 1
+
         # Not enough data needs to warm up
-        if len(self._prices) < self._min_window:
-            return []
-        
-        # drop old data to keep only necessary window
-        if len(self._prices) > self._min_window + 20:
-            self._prices = self._prices.iloc[-(self._min_window + 20):]
-
-        # FORCE numeric dtype for close (this is the key bit for Numba)
-        self._prices['close'] = pd.to_numeric(self._prices['close'], errors='coerce').astype('float64')
-        close = self._prices['close']
-
-        # calculate Bollinger Bands
-        bb = ta.bbands(close, length=self._period, lower_std=self._std, upper_std=self._std)
-        
-        # get current bollinger percent (shows position of price within bands)  
-        bbpercent = bb['BBP_' + str(self._period) + '_' + str(float(self._std)) + '_' + str(float(self._std))].iloc[-1]
-
-        # if current bbpercent is NaN, cannot generate signal
-        if pd.isna(bbpercent):
-            return []
-
-        # set flag to start generating signals only after in the normal range
-        
-        if bbpercent < 1 and bbpercent > 0:
-            self._flag = True
-
-        if not self._flag:
-            return []
-        
-        output = []
+        if self._n < self._min_window:
+            return NO_SIGNALS
 
-        # flag current overbought/oversold status
-        is_overbought = bbpercent > 1
-
-        # exit overbought when price within bands (BB% < 0.9)
-        overbought_closed = bbpercent < 0.9            
-
-        # generate signal if crossing overbought thresholds
-        if self._was_overbought is not None and is_overbought != self._was_overbought:
-            if is_overbought and self._last_action != -1:
-                # just became overbought
-                action = -1  # SELL
-                self._last_action = action
-                self._overboughtregime = True
-                output.append((action, tick.symbol, tick.close_price, tick.timestamp))
-        
-        if overbought_closed and self._last_action == -1 and self._overboughtregime:
-            # just exited overbought
-            action = 1  # BUY
-            self._overboughtregime = False
-            self._last_action = action
-            output.append((action, tick.symbol, tick.close_price, tick.timestamp))
-
-        # generate signal if crossing oversold thresholds
-        is_oversold = bbpercent < 0
-
-        # exit oversold when price within bands (BB% > 0.1)
-        oversold_closed = bbpercent > 0.1
-        if self._was_oversold is not None and is_oversold != self._was_oversold:
-            if is_oversold and self._last_action != 1:
-                # just became oversold
-                action = 1  # BUY
-                self._oversoldregime = True
-                self._last_action = action
-                output.append((action, tick.symbol, tick.close_price, tick.timestamp))
-        
-        if oversold_closed and self._last_action == 1 and self._oversoldregime:
-            # just exited oversold
-            action = -1  # SELL
-            self._oversoldregime = False
-            self._last_action = action
-            output.append((action, tick.symbol, tick.close_price, tick.timestamp))
-            
-        # Update state for next tick and return any signal
-        self._was_overbought = is_overbought
-        self._was_oversold = is_oversold
-        
-        return output
+        # periodically rebuild the sums from the ring to cancel float drift
+        if self._n % 4096 == 0:
+            self._sum = float(self._ring.sum())
+            self._sumsq = float((self._ring * self._ring).sum())
+
+        # bollinger percent (position of price within the bands), computed
+        # with the sample std (ddof=1) to match ta.bbands
+        bbpercent = _bbp_from_sums(price, self._sum, self._sumsq, p, self._std)
+        if math.isnan(bbpercent):
+            # degenerate flat window, no meaningful band position
+            return NO_SIGNALS
+
+        # shared regime state machine: exit when price is back within the
+        # bands (BB% < 0.9 / > 0.1)
+        return self._regime_signals(bbpercent, 1.0, 0.0, 0.9, 0.1, tick)
 
 
 class Zscore(Strategy):
@@ -221,10 +191,14 @@ class Zscore(Strategy):
     ''' Strategy that generates buy/sell signals based on z-score levels. '''
     
     def __init__(self, period: int = 60, std: float = 2.0):
-        self._prices = pd.DataFrame(columns=['close'])
         self._period = period
         self._std = std
         self._min_window = 80  # minimum data points to start generating signals (warm-up period)
+        # streaming z-score state: same running-sums ring as BB
+        self._ring = np.zeros(period, dtype=np.float64)
+        self._sum = 0.0
+        self._sumsq = 0.0
+        self._n = 0  # total ticks seen
         self._was_overbought = False
         self._was_oversold = False
         self._flag = False  # flag to start generating signals only after normal range touched
@@ -236,119 +210,96 @@ class Zscore(Strategy):
 
         """ Generates buy/sell signals based on z-score levels."""
 
-        # add new price to DataFrame 
-        self._prices.loc[len(self._prices), 'close'] = float(tick.close_price)
-        
+        price = float(tick.close_price)
+
+        # O(1) update: swap the oldest close out of the running sums
+        p = self._period
+        self._sum, self._sumsq = _roll_step(self._ring, self._n % p, price, self._sum, self._sumsq)
+        self._n += 1
+
         # Not enough data needs to warm up
-        if len(self._prices) < self._min_window:
-            return []
-        
-        # drop old data to keep only necessary window
-        if len(self._prices) > self._min_window + 20:
-            self._prices = self._prices.iloc[-(self._min_window + 20):]
-
-        # FORCE numeric dtype for close (this is the key bit for Numba)
-        self._prices['close'] = pd.to_numeric(self._prices['close'], errors='coerce').astype('float64')
-        close = self._prices['close']
-
-        # calculate running z-score
-        zscore = ta.zscore(close, length=self._period)
-        
-        # get current z-score
-        zscore = zscore.iloc[-1]
-
-        # if current zscore is NaN, cannot generate signal
-        if pd.isna(zscore):
-            return []
-
-        # set flag to start generating signals only after in the normal range
-        
-        if zscore < self._std and zscore > -self._std:
-            self._flag = True
-
-        if not self._flag:
-            return []
-        
-        output = []
+        if self._n < self._min_window:
+            return NO_SIGNALS
+
+        # periodically rebuild the sums from the ring to cancel float drift
+        if self._n % 4096 == 0:
+            self._sum = float(self._ring.sum())
+            self._sumsq = float((self._ring * self._ring).sum())
+
+        # current z-score from the running mean and sample std (ddof=1,
+        # matching ta.zscore)
+        zscore = _z_from_sums(price, self._sum, self._sumsq, p)
+        if math.isnan(zscore):
+            # degenerate flat window, no meaningful z-score
+            return NO_SIGNALS
+
+        # shared regime state machine: exit when the z-score has
+        # mean-reverted one unit inside the band
+        return self._regime_signals(
+            zscore, self._std, -self._std, self._std - 1, -self._std + 1, tick
+        )
+
+def make_strategy_triplet() -> list:
+    """
+    One fresh RSI/BB/Zscore triplet with the parameters used everywhere
+    (backtest and live). Keeps the parameter set defined in one place
+    instead of copy-pasted at every entry point; construction itself is
+    cheap now that the strategies hold only scalar/ring state.
+    """
+    return [
+        RSI(period=3, overbought=80.0, oversold=20.0),
+        BB(period=20, std=2.0),
+        Zscore(period=60, std=2.0),
+    ]
+
+
+class CombinedMomentum(Strategy):
+
+    ''' Fused RSI + Bollinger + z-score strategy: one call per tick updates
+    all three streaming indicators and returns the merged signals. '''
+
+    def __init__(self):
+        # the three windows differ (3/20/60), so their streaming state stays
+        # disjoint; the fusion win here is one driver call and one merged
+        # signal list per tick instead of three of each
+        self._rsi, self._bb, self._zscore = make_strategy_triplet()
+
+    def generate_signals(self, tick: MarketData) -> list:
+
+        """ Generates the merged buy/sell signals of all three strategies.
+        Each sub-strategy contributes at most its last signal for the tick
+        (the same "last signal wins" reduction the engines apply). """
 
-        # flag current overbought/oversold status
-        is_overbought = zscore > self._std
-
-        # exit overbought when price within bands (zscore < std - 1)
-        overbought_closed = zscore < self._std - 1            
-
-        # generate signal if crossing overbought thresholds
-        if self._was_overbought is not None and is_overbought != self._was_overbought:
-            if is_overbought and self._last_action != -1:
-                # just became overbought
-                action = -1  # SELL
-                self._last_action = action
-                self._overboughtregime = True
-                output.append((action, tick.symbol, tick.close_price, tick.timestamp))
-        
-        if overbought_closed and self._last_action == -1 and self._overboughtregime:
-            # just exited overbought
-            action = 1  # BUY
-            self._overboughtregime = False
-            self._last_action = action
-            output.append((action, tick.symbol, tick.close_price, tick.timestamp))
-
-        # generate signal if crossing oversold thresholds
-        is_oversold = zscore < -self._std
-
-        # exit oversold when price within bands (zscore > -std + 1)
-        oversold_closed = zscore > -self._std + 1
-        if self._was_oversold is not None and is_oversold != self._was_oversold:
-            if is_oversold and self._last_action != 1:
-                # just became oversold
-                action = 1  # BUY
-                self._oversoldregime = True
-                self._last_action = action
-                output.append((action, tick.symbol, tick.close_price, tick.timestamp))
-        
-        if oversold_closed and self._last_action == 1 and self._oversoldregime:
-            # just exited oversold
-            action = -1  # SELL
-            self._oversoldregime = False
-            self._last_action = action
-            output.append((action, tick.symbol, tick.close_price, tick.timestamp))
-            
-        # Update state for next tick and return any signal
-        self._was_overbought = is_overbought
-        self._was_oversold = is_oversold
-        
+        sig_r = self._rsi.generate_signals(tick)
+        sig_b = self._bb.generate_signals(tick)
+        sig_z = self._zscore.generate_signals(tick)
+
+        if not (sig_r or sig_b or sig_z):
+            return NO_SIGNALS
+
+        output = []
+        for sigs in (sig_r, sig_b, sig_z):
+            if sigs:
+                output.append(sigs[-1])
         return output
 
+
 # --- example usage for a single symbol ---
 
 if __name__ == "__main__":
     df = pd.read_csv("data/NVDA_data.csv", index_col="timestamp", parse_dates=True)
     gateway = DataGateway(df)
-    strategy_rsi = RSI(period=3, overbought=80.0, oversold=20.0)
-    strategy_bb = BB(period=20, std=2.0)
-    strategy_zscore = Zscore(period=60, std=2.0)
+    strategy = CombinedMomentum()
 
     position = 0  # 0 = flat, 1 = long, -1 = short
 
-    def get_action(sig_list):
-        if not sig_list:
-            return 0
-        return sig_list[-1][0]   # (action, symbol, price, timestamp)
-
     for tick in gateway.stream_data():
-        sig_z = strategy_zscore.generate_signals(tick)
-        sig_r = strategy_rsi.generate_signals(tick)
-        sig_b = strategy_bb.generate_signals(tick)
-
-        a_z = get_action(sig_z)
-        a_r = get_action(sig_r)
-        a_b = get_action(sig_b)
-
-        num_buy  = (a_z == 1) + (a_r == 1) + (a_b == 1)
-        num_sell = (a_z == -1) + (a_r == -1) + (a_b == -1)
+        # one fused call: merged (action, symbol, price, timestamp) signals
+        # of all three indicators, at most one per sub-strategy
+        any_sig_list = strategy.generate_signals(tick)
 
-        # choose some signal to get (symbol, price, timestamp) when needed
-        any_sig_list = sig_z or sig_r or sig_b
+        num_buy  = sum(1 for s in any_sig_list if s[0] == 1)
+        num_sell = sum(1 for s in any_sig_list if s[0] == -1)
 
         # --- ENTRY / EXIT LOGIC ---
 
@@ -0,0 +1,426 @@
+"""
+Vectorized variant of the multi-asset backtest.
+
+Instead of driving pandas_ta once per tick inside the strategies, this module
+computes each indicator over the *full* close series of a symbol in one
+vectorized call, runs the (cheap, pure-numeric) overbought/oversold state
+machine over the resulting array, and then simulates cash/positions with a
+tight loop over flat NumPy arrays. The per-tick Python overhead of the
+streaming engine (Series construction, DataFrame appends, method dispatch)
+disappears entirely.
+
+Note on exactness: results can differ slightly from the streaming engine.
+The streaming strategies compute over a fixed trailing ring buffer of recent
+closes, so recursive indicators (RSI's Wilder smoothing, the bbands/zscore
+warmup) see less history than the full-series computation here; window-local
+indicators agree exactly once warmed up.
+"""
+
+import numpy as np
+import pandas as pd
+import pandas_ta as ta
+
+from data_loader import DataLoader
+from models import NO_SIGNALS
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# pandas_ta names the %B column after the parameters; build it once here
+# instead of concatenating strings at every lookup site
+_BBP_COL = f"BBP_{20}_{2.0}_{2.0}"
+
+try:
+    import talib
+except ImportError:
+    talib = None
+
+
+# ---------- per-symbol signal generation ----------
+
+def _regime_directions(values, upper, lower, exit_upper, exit_lower):
+    """
+    Run the overbought/oversold state machine (same logic as the streaming
+    RSI/BB/Zscore strategies) over a full indicator array.
+
+    Returns an int8 array of per-tick directions: +1 BUY, -1 SELL, 0 nothing.
+    When a tick fires both branches, the last one wins (matches the
+    "use the last signal" reduction in the engines).
+    """
+    n = len(values)
+    out = np.zeros(n, dtype=np.int8)
+
+    flag = False
+    was_overbought = False
+    was_oversold = False
+    last_action = 0
+    overbought_regime = False
+    oversold_regime = False
+
+    for i in range(n):
+        v = values[i]
+        if v != v:  # NaN: no signal, no state update
+            continue
+
+        if lower < v < upper:
+            flag = True
+        if not flag:
+            continue
+
+        direction = 0
+
+        is_overbought = v > upper
+        if is_overbought != was_overbought and is_overbought and last_action != -1:
+            last_action = -1
+            overbought_regime = True
+            direction = -1
+        if v < exit_upper and last_action == -1 and overbought_regime:
+            last_action = 1
+            overbought_regime = False
+            direction = 1
+
+        is_oversold = v < lower
+        if is_oversold != was_oversold and is_oversold and last_action != 1:
+            last_action = 1
+            oversold_regime = True
+            direction = 1
+        if v > exit_lower and last_action == 1 and oversold_regime:
+            last_action = -1
+            oversold_regime = False
+            direction = -1
+
+        was_overbought = is_overbought
+        was_oversold = is_oversold
+        out[i] = direction
+
+    return out
+
+
+def compute_directions(close: pd.Series) -> np.ndarray:
+    """
+    Vectorized cold-start for one symbol: compute RSI / Bollinger %B / z-score
+    over the whole close series in three calls, then derive the per-tick
+    direction of each strategy. Returns an (n, 3) int8 array.
+    """
+    # loaders already deliver float64 closes; only cast if something odd
+    # (e.g. an object column from a hand-edited CSV) slips through
+    if close.dtype != np.float64:
+        close = pd.to_numeric(close, errors="coerce").astype("float64")
+    n = len(close)
+
+    if talib is not None:
+        # C-backed TA-Lib path, several times faster than pandas_ta.
+        # Note: TA-Lib's STDDEV/BBANDS use the population std (ddof=0),
+        # so values differ marginally from the pandas_ta ones near the
+        # thresholds; the regime logic tolerates that.
+        arr = close.to_numpy(copy=True)
+        rsi = talib.RSI(arr, timeperiod=3)
+        upper, _, lower = talib.BBANDS(arr, timeperiod=20, nbdevup=2.0, nbdevdn=2.0)
+        bbp = (arr - lower) / (upper - lower)
+        mean = talib.SMA(arr, timeperiod=60)
+        sd = talib.STDDEV(arr, timeperiod=60, nbdev=1.0)
+        zs = (arr - mean) / sd
+    else:
+        rsi = ta.rsi(close, length=3).to_numpy(copy=True)
+        bb = ta.bbands(close, length=20, lower_std=2.0, upper_std=2.0)
+        bbp = bb[_BBP_COL].to_numpy(copy=True)
+        zs = ta.zscore(close, length=60).to_numpy(copy=True)
+
+    # the regime pass only compares these against fixed thresholds, so
+    # float32 is plenty of precision and halves the memory it streams
+    # (thresholds stay Python floats; the comparisons upcast)
+    rsi = rsi.astype(np.float32)
+    bbp = bbp.astype(np.float32)
+    zs = zs.astype(np.float32)
+
+    # warm-up: the streaming strategies stay silent before their min_window
+    rsi[: min(19, n)] = np.nan
+    bbp[: min(34, n)] = np.nan
+    zs[: min(79, n)] = np.nan
+
+    directions = np.empty((n, 3), dtype=np.int8)
+    directions[:, 0] = _regime_directions(rsi, 80.0, 20.0, 70.0, 30.0)
+    directions[:, 1] = _regime_directions(bbp, 1.0, 0.0, 0.9, 0.1)
+    directions[:, 2] = _regime_directions(zs, 2.0, -2.0, 1.0, -1.0)
+    return directions
+
+
+class PrecomputedDirections:
+    """
+    Drop-in replacement for a streaming strategy: replays one column of the
+    per-symbol direction matrix from compute_directions. The engine keeps its
+    tick-by-tick shape, but the per-tick pandas_ta work is gone -- each call
+    is an array read and a cursor bump.
+    """
+
+    def __init__(self, directions):
+        self._directions = directions
+        self._i = 0
+
+    def generate_signals(self, tick) -> list:
+        i = self._i
+        self._i = i + 1
+        d = self._directions[i]
+        if d == 0:
+            return NO_SIGNALS
+        # (action, symbol, price, ts) like the live strategies
+        return [(int(d), tick[1], tick[2], tick[0])]
+
+
+# ---------- global simulation over flat arrays ----------
+
+def _simulate(sym_ids, prices, d0, d1, d2, n_symbols, initial_capital, frac):
+    """
+    Tight loop over the merged global tick stream. All state is held in flat
+    arrays indexed by symbol id, so numba can compile this in nopython mode.
+
+    Returns (cash_history, trade arrays, open positions for finalize).
+    """
+    n = len(sym_ids)
+    cash = initial_capital
+    positions = np.zeros(n_symbols, dtype=np.int64)
+    entry_price = np.zeros(n_symbols, dtype=np.float64)
+    last_price = np.zeros(n_symbols, dtype=np.float64)
+
+    cash_history = np.empty(n, dtype=np.float64)
+
+    # trade log (preallocated; trades are a small fraction of ticks)
+    t_tick = np.empty(n, dtype=np.int64)
+    t_sid = np.empty(n, dtype=np.int64)
+    t_side = np.empty(n, dtype=np.int8)    # +1 BUY, -1 SELL
+    t_qty = np.empty(n, dtype=np.int64)
+    t_price = np.empty(n, dtype=np.float64)
+    t_pnl = np.empty(n, dtype=np.float64)
+    n_trades = 0
+
+    for i in range(n):
+        sid = sym_ids[i]
+        price = prices[i]
+        last_price[sid] = price
+
+        num_buy = (d0[i] == 1) + (d1[i] == 1) + (d2[i] == 1)
+        num_sell = (d0[i] == -1) + (d1[i] == -1) + (d2[i] == -1)
+
+        if num_buy != 0 or num_sell != 0:
+            pos = positions[sid]
+
+            open_long = pos == 0 and num_buy >= 2 and num_sell == 0
+            open_short = pos == 0 and num_sell >= 2 and num_buy == 0
+            close_long = pos > 0 and num_sell >= 2
+            close_short = pos < 0 and num_buy >= 2
+
+            if open_long or open_short:
+                # portfolio value = cash + mark-to-market of open positions
+                port_val = cash
+                for s in range(n_symbols):
+                    if positions[s] != 0:
+                        port_val += positions[s] * last_price[s]
+                notional_target = port_val * frac
+                qty = int(notional_target // price) if notional_target > 0 else 0
+                if open_long and qty > 0:
+                    qty = min(qty, int(cash // price))
+                if qty > 0:
+                    if open_long:
+                        cash -= qty * price
+                        positions[sid] += qty
+                        side = 1
+                    else:
+                        cash += qty * price
+                        positions[sid] -= qty
+                        side = -1
+                    entry_price[sid] = price
+                    t_tick[n_trades] = i
+                    t_sid[n_trades] = sid
+                    t_side[n_trades] = side
+                    t_qty[n_trades] = qty
+                    t_price[n_trades] = price
+                    t_pnl[n_trades] = 0.0
+                    n_trades += 1
+
+            elif close_long or close_short:
+                qty = positions[sid]
+                if qty > 0:
+                    cash += qty * price
+                    pnl = (price - entry_price[sid]) * qty
+                    side = -1
+                else:
+                    cash -= (-qty) * price
+                    pnl = (entry_price[sid] - price) * (-qty)
+                    side = 1
+                positions[sid] = 0
+                t_tick[n_trades] = i
+                t_sid[n_trades] = sid
+                t_side[n_trades] = side
+                t_qty[n_trades] = abs(qty)
+                t_price[n_trades] = price
+                t_pnl[n_trades] = pnl
+                n_trades += 1
+
+        cash_history[i] = cash
+
+    return (
+        cash_history,
+        t_tick[:n_trades], t_sid[:n_trades], t_side[:n_trades],
+        t_qty[:n_trades], t_price[:n_trades], t_pnl[:n_trades],
+        positions, entry_price, last_price, cash,
+    )
+
+
+if njit is not None:
+    _regime_directions = njit(cache=True)(_regime_directions)
+    _simulate = njit(cache=True)(_simulate)
+
+
+# ---------- runner ----------
+
+STOCK_UNIVERSE = [
+    # Mega-cap tech
+    "AAPL", "MSFT", "NVDA", "AMZN", "GOOGL", "META", "TSLA", "AVGO", "NFLX",
+    # Semiconductors
+    "AMD", "QCOM", "INTC", "MU", "TSM", "ADI", "NXPI", "AMAT", "LRCX",
+    # Financials
+    "JPM", "BAC", "WFC", "C", "GS", "MS", "BLK", "SCHW", "AXP",
+    # Energy
+    "XOM", "CVX", "COP", "SLB", "EOG", "PSX",
+    # Industrials
+    "UNP", "CAT", "DE", "GE", "LMT", "NOC", "BA", "MMM", "ETN",
+    # Healthcare
+    "UNH", "JNJ", "PFE", "ABBV", "MRK", "LLY", "TMO", "BMY", "GILD",
+    # Consumer staples
+    "PG", "KO", "PEP", "WMT", "COST", "MDLZ", "MO", "PM",
+    # Consumer discretionary
+    "HD", "MCD", "SBUX", "LOW", "TGT", "NKE", "TJX",
+    # Communication services
+    "VZ", "T", "TMUS", "DIS", "CMCSA",
+    # Real estate
+    "PLD", "AMT", "EQIX", "O", "SPG",
+    # Utilities
+    "NEE", "DUK", "SO", "EXC", "AEP",
+    # Materials
+    "LIN", "SHW", "FCX", "NUE",
+    # Software + cloud + cyber
+    "CRM", "ADBE", "INTU", "NOW", "PANW", "CRWD", "SNOW", "DDOG",
+    # Payment processors
+    "V", "MA", "PYPL", "SQ",
+    # EV & automotive
+    "F", "GM", "RIVN", "LCID",
+    # Airlines & travel
+    "DAL", "AAL", "UAL", "LUV", "MAR", "BKNG",
+]
+
+CRYPTO_UNIVERSE = [
+    "BTC/USD",
+    "ETH/USD",
+    "SOL/USD",
+    "DOGE/USD",
+    "LTC/USD",
+    "BCH/USD",
+    "ADA/USD",
+    "MATIC/USD",
+    "DOT/USD",
+    "AVAX/USD",
+]
+
+
+def run_backtest_vectorized(
+    initial_capital: float = 100_000.0,
+    notional_frac_per_trade: float = 0.02,
+):
+    """
+    Same trade logic and outputs as backtest.run_backtest, but driven by
+    precomputed direction arrays and a flat-array simulation loop.
+    """
+    universe = STOCK_UNIVERSE + CRYPTO_UNIVERSE
+    loader = DataLoader(symbol="", days=5, list_of_symbols=universe)
+
+    frames = []
+    for sym in universe:
+        df = loader.load_data(sym)
+        if df is None:
+            continue
+        directions = compute_directions(df["close"])
+        df = df.assign(d0=directions[:, 0], d1=directions[:, 1], d2=directions[:, 2])
+        frames.append(df)
+
+    if not frames:
+        print("No symbols with usable data. Exiting.")
+        return
+
+    all_data = pd.concat(frames).sort_index()
+
+    sym_ids, symbols = pd.factorize(all_data["symbol"].to_numpy())
+    prices = all_data["close"].to_numpy(dtype="float64")
+
+    (cash_history, t_tick, t_sid, t_side, t_qty, t_price, t_pnl,
+     positions, entry_price, last_price, cash) = _simulate(
+        sym_ids,
+        prices,
+        all_data["d0"].to_numpy(),
+        all_data["d1"].to_numpy(),
+        all_data["d2"].to_numpy(),
+        len(symbols),
+        initial_capital,
+        notional_frac_per_trade,
+    )
+
+    timestamps = all_data.index.to_numpy()
+
+    # finalize: close whatever is still open at the last seen price
+    final_trades = []
+    for sid in np.nonzero(positions)[0]:
+        qty = int(positions[sid])
+        price = last_price[sid]
+        if qty > 0:
+            cash += qty * price
+            pnl = (price - entry_price[sid]) * qty
+            side = "SELL"
+        else:
+            cash -= (-qty) * price
+            pnl = (entry_price[sid] - price) * (-qty)
+            side = "BUY"
+        final_trades.append(
+            (symbols[sid], timestamps[-1], side, abs(qty), price, pnl)
+        )
+
+    trades_df = pd.DataFrame(
+        {
+            "symbol": symbols[t_sid],
+            "timestamp": timestamps[t_tick],
+            "side": np.where(t_side == 1, "BUY", "SELL"),
+            "qty": t_qty,
+            "price": t_price,
+            "pnl": t_pnl,
+        }
+    )
+    if final_trades:
+        trades_df = pd.concat(
+            [trades_df, pd.DataFrame(final_trades, columns=trades_df.columns)],
+            ignore_index=True,
+        )
+
+    realized_pnl = trades_df["pnl"].sum()
+    port_val = cash  # everything is closed after finalize
+    print(f"Initial capital : {initial_capital:,.2f}")
+    print(f"Final cash      : {cash:,.2f}")
+    print(f"Portfolio value : {port_val:,.2f}")
+    print(f"Realized P&L    : {realized_pnl:,.2f}")
+    print(f"# trades        : {len(trades_df)}")
+
+    cash_history_df = pd.DataFrame(
+        {"timestamp": timestamps, "cash": cash_history}
+    ).set_index("timestamp")
+
+    # same export as backtest.run_backtest: parquet, with CSV as the
+    # pyarrow-less fallback
+    try:
+        trades_df.to_parquet("output/backtest_trades_log.parquet", index=False)
+        cash_history_df.to_parquet("output/backtest_cash_history.parquet", index=True)
+    except ImportError:
+        trades_df.to_csv("output/backtest_trades_log.csv", index=False)
+        cash_history_df.to_csv("output/backtest_cash_history.csv", index=True)
+
+
+if __name__ == "__main__":
+    run_backtest_vectorized()